@@ -1,8 +1,11 @@
 import tkinter as tk
-from tkinter import ttk, messagebox, scrolledtext
+from tkinter import ttk, messagebox, scrolledtext, filedialog
 from collections import defaultdict
 import json
+import os
 import time
+from pda_core import PDA, parse_transition, verdict
+from pda_export import WRITERS as EXPORT_WRITERS, TraceReader, export_run
 
 class PDASimulator:
     def __init__(self, root):
@@ -18,12 +21,16 @@ class PDASimulator:
         self.start_state = ""
         self.accept_states = set()
         self.stack_bottom = "$"
+        self.pda = PDA()
         
         # Visualization variables
         self.simulation_running = False
         self.simulation_speed = 1000  # milliseconds
         self.current_step = 0
         self.simulation_steps = []
+        self.simulation_input = ""
+        self.simulation_result = None
+        self.trace_reader = None
         
         self.setup_gui()
         
@@ -159,6 +166,8 @@ class PDASimulator:
         
         ttk.Button(button_frame, text="Simulate", command=self.simulate).pack(side=tk.LEFT, padx=5)
         ttk.Button(button_frame, text="Step-by-Step", command=self.step_by_step_simulate).pack(side=tk.LEFT, padx=5)
+        ttk.Button(button_frame, text="Shortest Witness", command=self.witness_simulate).pack(side=tk.LEFT, padx=5)
+        ttk.Button(button_frame, text="Export Trace", command=self.export_trace).pack(side=tk.LEFT, padx=5)
         ttk.Button(button_frame, text="Clear Output", command=self.clear_output).pack(side=tk.RIGHT, padx=5)
         
         # Result section
@@ -199,6 +208,9 @@ class PDASimulator:
         self.start_btn = ttk.Button(button_row, text="Start Visual Simulation", command=self.start_visual_simulation)
         self.start_btn.pack(side=tk.LEFT, padx=5)
         
+        self.load_trace_btn = ttk.Button(button_row, text="Load Trace", command=self.load_trace)
+        self.load_trace_btn.pack(side=tk.LEFT, padx=5)
+        
         self.pause_btn = ttk.Button(button_row, text="Pause", command=self.pause_simulation, state=tk.DISABLED)
         self.pause_btn.pack(side=tk.LEFT, padx=5)
         
@@ -343,17 +355,17 @@ class PDASimulator:
             for i in range(self.transitions_listbox.size()):
                 trans_str = self.transitions_listbox.get(i)
                 try:
-                    left, right = trans_str.split(' → ')
-                    state, input_char, stack_top = left.split(',')
-                    next_state, stack_push = right.split(',')
-                    
-                    key = (state.strip(), input_char.strip(), stack_top.strip())
-                    value = (next_state.strip(), stack_push.strip())
+                    key, value = parse_transition(trans_str)
                     self.transitions[key].append(value)
                 except:
                     messagebox.showerror("Error", f"Invalid transition format: {trans_str}")
                     return
                     
+            self.pda = PDA(states=self.states, alphabet=self.alphabet,
+                           stack_alphabet=self.stack_alphabet, transitions=self.transitions,
+                           start_state=self.start_state, accept_states=self.accept_states,
+                           stack_bottom=self.stack_bottom)
+            
             messagebox.showinfo("Success", "PDA updated successfully!")
             
         except Exception as e:
@@ -367,7 +379,7 @@ class PDASimulator:
         
         self.result_text.delete(1.0, tk.END)
         self.result_text.insert(tk.END, f"Input: {input_string}\n")
-        self.result_text.insert(tk.END, f"Result: {'ACCEPTED' if result['accepted'] else 'REJECTED'}\n")
+        self.result_text.insert(tk.END, f"Result: {verdict(result)}\n")
         self.result_text.insert(tk.END, f"Final State: {result.get('final_state', 'N/A')}\n")
         self.result_text.insert(tk.END, f"Final Stack: {result.get('final_stack', 'N/A')}\n\n")
         
@@ -399,7 +411,63 @@ class PDASimulator:
                     self.result_text.insert(tk.END, f"  Stack Operation: {step['operation']}\n")
                 self.result_text.insert(tk.END, "\n")
                 
-        self.result_text.insert(tk.END, f"Final Result: {'ACCEPTED' if result['accepted'] else 'REJECTED'}\n")
+        self.result_text.insert(tk.END, f"Final Result: {verdict(result)}\n")
+        
+    def witness_simulate(self):
+        self.update_pda()
+        input_string = self.input_string_entry.get()
+        
+        # Same depth budget as run, so an ε-push loop cannot stall the main loop
+        result = self.pda.witness(input_string, max_depth=1000)
+        
+        self.result_text.delete(1.0, tk.END)
+        self.result_text.insert(tk.END, f"Shortest Witness for: {input_string}\n")
+        self.result_text.insert(tk.END, "=" * 60 + "\n\n")
+        
+        if result.get('error'):
+            self.result_text.insert(tk.END, f"Error: {result['error']}\n")
+            return
+            
+        if result['accepted']:
+            self.result_text.insert(tk.END, f"Result: ACCEPTED in {result['moves']} moves "
+                                            f"(max stack {result['max_stack']})\n")
+        else:
+            if result['exhausted']:
+                self.result_text.insert(tk.END, "Result: UNKNOWN (search limit reached)\n")
+            else:
+                self.result_text.insert(tk.END, "Result: REJECTED\n")
+            self.result_text.insert(tk.END, f"Longest Consumed Prefix: '{result['longest_prefix']}'\n")
+        self.result_text.insert(tk.END, f"Configurations Explored: {result['explored']}\n\n")
+        
+        self.result_text.insert(tk.END, "Witness:\n")
+        self.result_text.insert(tk.END, "-" * 50 + "\n")
+        for step in result['trace']:
+            self.result_text.insert(tk.END, step + "\n")
+            
+    def export_trace(self):
+        self.update_pda()
+        input_string = self.input_string_entry.get()
+        
+        path = filedialog.asksaveasfilename(
+            title="Export Trace", defaultextension=".ndjson",
+            filetypes=[("NDJSON trace", "*.ndjson"), ("Graphviz DOT graph", "*.dot"), ("Columnar CSV", "*.csv")])
+        if not path:
+            return
+            
+        export_format = os.path.splitext(path)[1][1:].lower()
+        if export_format not in EXPORT_WRITERS:
+            messagebox.showerror("Error", f"Unsupported export format: .{export_format}")
+            return
+            
+        try:
+            with open(path, "w", encoding="utf-8", newline="") as f:
+                result = export_run(self.pda, input_string, [EXPORT_WRITERS[export_format](f)])
+        except (OSError, ValueError) as e:
+            messagebox.showerror("Error", f"Error exporting trace: {str(e)}")
+            return
+            
+        messagebox.showinfo("Success", f"Trace exported to {path}\n"
+                                       f"Result: {verdict(result)}")
         
     def start_visual_simulation(self):
         self.update_pda()
@@ -409,138 +477,55 @@ class PDASimulator:
             messagebox.showwarning("Warning", "Please enter an input string!")
             return
             
-        # Generate simulation steps
-        self.simulation_steps = self.generate_visual_steps(input_string)
+        # Animate the same search and step records that run_pda produces
+        result = self.run_pda(input_string, step_by_step=True)
+        self.play_steps(input_string, result.get('steps', []), verdict(result))
+        
+    def load_trace(self):
+        path = filedialog.askopenfilename(
+            title="Load Trace", filetypes=[("NDJSON trace", "*.ndjson"), ("All files", "*.*")])
+        if not path:
+            return
+            
+        # Steps are read from the memory-mapped file as they are shown
+        try:
+            reader = TraceReader(path)
+        except (OSError, ValueError) as e:
+            messagebox.showerror("Error", f"Error loading trace: {str(e)}")
+            return
+            
+        self.visual_input_entry.delete(0, tk.END)
+        self.visual_input_entry.insert(0, reader.input_string)
+        self.play_steps(reader.input_string, reader, reader.final_result)
+        self.trace_reader = reader
+        
+    def play_steps(self, input_string, steps, final_result):
+        self.close_trace()
+        self.simulation_input = input_string
+        self.simulation_steps = steps
+        self.simulation_result = final_result
         self.current_step = 0
         self.simulation_running = True
         
         # Update UI
         self.start_btn.config(state=tk.DISABLED)
+        self.load_trace_btn.config(state=tk.DISABLED)
         self.pause_btn.config(state=tk.NORMAL)
         self.step_btn.config(state=tk.NORMAL)
         
         # Start animation
         self.animate_step()
         
-    def generate_visual_steps(self, input_string):
-        if not self.start_state or not self.states:
-            return []
-            
-        steps = []
-        
-        def explore_path(state, pos, stack_state, path):
-            # Record current configuration
-            step = {
-                'state': state,
-                'position': pos,
-                'stack': stack_state[:],
-                'remaining_input': input_string[pos:] if pos < len(input_string) else "",
-                'transition': None,
-                'operation': None,
-                'path': path[:]
-            }
-            steps.append(step)
-            
-            # Check acceptance
-            if pos == len(input_string) and state in self.accept_states:
-                step['accepted'] = True
-                return True
-                
-            # Try epsilon transitions
-            for (s, inp, stack_top), transitions in self.transitions.items():
-                if s == state and inp == 'ε':
-                    if stack_top == 'ε' or (stack_state and stack_state[-1] == stack_top):
-                        for next_state, stack_push in transitions:
-                            new_stack = stack_state[:]
-                            operation = []
-                            
-                            # Pop operation
-                            if stack_top != 'ε' and new_stack:
-                                popped = new_stack.pop()
-                                operation.append(f"POP {popped}")
-                            
-                            # Push operation
-                            if stack_push != 'ε':
-                                for char in reversed(stack_push):
-                                    new_stack.append(char)
-                                    operation.append(f"PUSH {char}")
-                            
-                            transition_info = f"{s},ε,{stack_top} → {next_state},{stack_push}"
-                            new_path = path + [transition_info]
-                            
-                            step_with_trans = {
-                                'state': state,
-                                'position': pos,
-                                'stack': stack_state[:],
-                                'remaining_input': input_string[pos:] if pos < len(input_string) else "",
-                                'transition': transition_info,
-                                'operation': "; ".join(operation) if operation else "No stack operation",
-                                'path': new_path,
-                                'next_state': next_state,
-                                'new_stack': new_stack[:]
-                            }
-                            steps.append(step_with_trans)
-                            
-                            if explore_path(next_state, pos, new_stack, new_path):
-                                return True
-            
-            # Try input transitions
-            if pos < len(input_string):
-                current_char = input_string[pos]
-                for (s, inp, stack_top), transitions in self.transitions.items():
-                    if s == state and inp == current_char:
-                        if stack_top == 'ε' or (stack_state and stack_state[-1] == stack_top):
-                            for next_state, stack_push in transitions:
-                                new_stack = stack_state[:]
-                                operation = []
-                                
-                                # Pop operation
-                                if stack_top != 'ε' and new_stack:
-                                    popped = new_stack.pop()
-                                    operation.append(f"POP {popped}")
-                                
-                                # Push operation
-                                if stack_push != 'ε':
-                                    for char in reversed(stack_push):
-                                        new_stack.append(char)
-                                        operation.append(f"PUSH {char}")
-                                
-                                transition_info = f"{s},{inp},{stack_top} → {next_state},{stack_push}"
-                                new_path = path + [transition_info]
-                                
-                                step_with_trans = {
-                                    'state': state,
-                                    'position': pos,
-                                    'stack': stack_state[:],
-                                    'remaining_input': input_string[pos:],
-                                    'transition': transition_info,
-                                    'operation': "; ".join(operation) if operation else "No stack operation",
-                                    'path': new_path,
-                                    'next_state': next_state,
-                                    'new_stack': new_stack[:],
-                                    'input_consumed': current_char
-                                }
-                                steps.append(step_with_trans)
-                                
-                                if explore_path(next_state, pos + 1, new_stack, new_path):
-                                    return True
-            
-            return False
-        
-        # Initialize and run
-        initial_stack = [self.stack_bottom]
-        accepted = explore_path(self.start_state, 0, initial_stack, [])
-        
-        # Mark final result
-        if steps:
-            steps[-1]['final_result'] = 'ACCEPTED' if accepted else 'REJECTED'
+    def close_trace(self):
+        if self.trace_reader is not None:
+            self.trace_reader.close()
+            self.trace_reader = None
             
-        return steps
-        
     def animate_step(self):
         if not self.simulation_running or self.current_step >= len(self.simulation_steps):
             self.simulation_running = False
             self.start_btn.config(state=tk.NORMAL)
+            self.load_trace_btn.config(state=tk.NORMAL)
             self.pause_btn.config(state=tk.DISABLED)
             return
             
@@ -557,10 +542,8 @@ class PDASimulator:
         
         # Update current state display
         state_text = step['state']
-        if step.get('accepted'):
-            state_text += " (ACCEPTED)"
-        elif step.get('final_result'):
-            state_text += f" ({step['final_result']})"
+        if self.is_last_step() and self.simulation_result:
+            state_text += f" ({self.simulation_result})"
             
         self.current_state_label.config(text=state_text)
         
@@ -573,10 +556,13 @@ class PDASimulator:
         # Update step information
         self.update_step_info(step)
         
+    def is_last_step(self):
+        return self.current_step == len(self.simulation_steps) - 1
+        
     def draw_input_tape(self, step):
         self.tape_canvas.delete("all")
         
-        input_string = self.visual_input_entry.get()
+        input_string = self.simulation_input
         position = step['position']
         
         cell_width = 40
@@ -606,7 +592,7 @@ class PDASimulator:
     def draw_stack(self, step):
         self.stack_canvas.delete("all")
         
-        stack = step.get('new_stack', step.get('stack', []))
+        stack = step.get('stack')
         if not stack:
             stack = [self.stack_bottom]
             
@@ -616,7 +602,7 @@ class PDASimulator:
         canvas_height = self.stack_canvas.winfo_height()
         
         # Draw stack from bottom to top
-        for i, symbol in enumerate(reversed(stack)):
+        for i, symbol in enumerate(stack):
             y = canvas_height - 40 - i * cell_height
             
             # Draw cell
@@ -650,10 +636,10 @@ class PDASimulator:
             info += f"Transition: {step['transition']}\n"
         if step.get('operation'):
             info += f"Stack Operation: {step['operation']}\n"
-        if step.get('input_consumed'):
-            info += f"Input Consumed: '{step['input_consumed']}'\n"
-        if step.get('final_result'):
-            info += f"Final Result: {step['final_result']}\n"
+        if step.get('consumed'):
+            info += f"Input Consumed: '{step['consumed']}'\n"
+        if self.is_last_step() and self.simulation_result:
+            info += f"Final Result: {self.simulation_result}\n"
             
         self.step_info_text.insert(1.0, info)
         
@@ -667,20 +653,25 @@ class PDASimulator:
         else:
             self.simulation_running = False
             self.start_btn.config(state=tk.NORMAL)
+            self.load_trace_btn.config(state=tk.NORMAL)
             self.pause_btn.config(state=tk.DISABLED)
             
     def pause_simulation(self):
         self.simulation_running = False
         self.start_btn.config(state=tk.NORMAL)
+        self.load_trace_btn.config(state=tk.NORMAL)
         self.pause_btn.config(state=tk.DISABLED)
         
     def reset_simulation(self):
         self.simulation_running = False
         self.current_step = 0
         self.simulation_steps = []
+        self.simulation_result = None
+        self.close_trace()
         
         # Reset UI
         self.start_btn.config(state=tk.NORMAL)
+        self.load_trace_btn.config(state=tk.NORMAL)
         self.pause_btn.config(state=tk.DISABLED)
         self.step_btn.config(state=tk.DISABLED)
         
@@ -691,119 +682,7 @@ class PDASimulator:
         self.step_info_text.delete(1.0, tk.END)
         
     def run_pda(self, input_string, step_by_step=False):
-        if not self.start_state or not self.states:
-            return {'accepted': False, 'error': 'PDA not properly defined'}
-            
-        # Initialize
-        stack = [self.stack_bottom]
-        current_state = self.start_state
-        input_pos = 0
-        
-        trace = []
-        steps = []
-        
-        def add_step(state, remaining, stack_copy, transition=None, operation=None):
-            step_info = {
-                'state': state,
-                'remaining_input': remaining,
-                'stack': list(reversed(stack_copy)),
-                'transition': transition,
-                'operation': operation
-            }
-            
-            if step_by_step:
-                steps.append(step_info)
-                
-            trace_text = f"State: {state}, Input: '{remaining}', Stack: {list(reversed(stack_copy))}"
-            if transition:
-                trace_text += f", Transition: {transition}"
-            if operation:
-                trace_text += f", Operation: {operation}"
-            trace.append(trace_text)
-            
-        add_step(current_state, input_string[input_pos:], stack[:])
-        
-        # Simulation with detailed tracking
-        def simulate_recursive(state, pos, stack_state, depth=0):
-            if depth > 1000:  # Prevent infinite recursion
-                return False
-                
-            # Check if we can accept
-            if pos == len(input_string) and state in self.accept_states:
-                add_step(state, "", stack_state[:], "ACCEPT", "Accepting state reached")
-                return True
-                
-            # Try epsilon transitions first
-            for (s, inp, stack_top), transitions in self.transitions.items():
-                if s == state and inp == 'ε':
-                    if stack_top == 'ε' or (stack_state and stack_state[-1] == stack_top):
-                        for next_state, stack_push in transitions:
-                            new_stack = stack_state[:]
-                            operation_desc = []
-                            
-                            # Pop if needed
-                            if stack_top != 'ε' and new_stack:
-                                popped = new_stack.pop()
-                                operation_desc.append(f"POP {popped}")
-                            
-                            # Push if needed
-                            if stack_push != 'ε':
-                                for char in reversed(stack_push):
-                                    new_stack.append(char)
-                                    operation_desc.append(f"PUSH {char}")
-                            
-                            transition_str = f"{s},ε,{stack_top} → {next_state},{stack_push}"
-                            operation_str = "; ".join(operation_desc) if operation_desc else "No stack operation"
-                            
-                            add_step(next_state, input_string[pos:], new_stack[:], 
-                                   transition_str, operation_str)
-                            
-                            if simulate_recursive(next_state, pos, new_stack, depth + 1):
-                                return True
-            
-            # Try input transitions
-            if pos < len(input_string):
-                current_char = input_string[pos]
-                for (s, inp, stack_top), transitions in self.transitions.items():
-                    if s == state and inp == current_char:
-                        if stack_top == 'ε' or (stack_state and stack_state[-1] == stack_top):
-                            for next_state, stack_push in transitions:
-                                new_stack = stack_state[:]
-                                operation_desc = []
-                                
-                                # Pop if needed
-                                if stack_top != 'ε' and new_stack:
-                                    popped = new_stack.pop()
-                                    operation_desc.append(f"POP {popped}")
-                                
-                                # Push if needed
-                                if stack_push != 'ε':
-                                    for char in reversed(stack_push):
-                                        new_stack.append(char)
-                                        operation_desc.append(f"PUSH {char}")
-                                
-                                transition_str = f"{s},{inp},{stack_top} → {next_state},{stack_push}"
-                                operation_str = "; ".join(operation_desc) if operation_desc else "No stack operation"
-                                operation_str += f" (consumed '{current_char}')"
-                                
-                                add_step(next_state, input_string[pos+1:], new_stack[:], 
-                                       transition_str, operation_str)
-                                
-                                if simulate_recursive(next_state, pos + 1, new_stack, depth + 1):
-                                    return True
-            
-            return False
-        
-        # Run simulation
-        accepted = simulate_recursive(current_state, 0, stack[:])
-        
-        return {
-            'accepted': accepted,
-            'final_state': current_state,
-            'final_stack': list(reversed(stack)),
-            'trace': trace,
-            'steps': steps
-        }
+        return self.pda.run(input_string, step_by_step=step_by_step)
         
     def clear_output(self):
         self.result_text.delete(1.0, tk.END)
@@ -0,0 +1,187 @@
+"""Headless batch verification of input strings against a PDA definition.
+
+Example:
+    python pda_cli.py balanced.json inputs.txt --jobs 4 --format csv
+"""
+
+import argparse
+import csv
+import json
+import os
+import sys
+from itertools import islice
+
+import pda_export
+from pda_core import ENGINES, PDA, verdict
+
+_worker = {}
+
+
+def _init_worker(definition, options):
+    _worker['pda'] = PDA.from_dict(definition)
+    _worker['options'] = options
+
+
+def _verify(item):
+    pda = _worker['pda']
+    options = _worker['options']
+    line_no, item_id, input_string = item
+
+    budgets = {'max_depth': options['max_depth'], 'max_steps': options['max_steps'],
+               'max_stack': options['max_stack']}
+
+    export_path = None
+    if options['export']:
+        # Stream the DFS trace straight to one file per input
+        export_format = options['export_format']
+        export_path = os.path.join(options['export'], f"{line_no}.{export_format}")
+        with open(export_path, "w", encoding="utf-8", newline="") as f:
+            writer = pda_export.WRITERS[export_format](f)
+            result = pda_export.export_run(pda, input_string, [writer], **budgets)
+    else:
+        run = ENGINES[options['engine']]
+        result = run(pda, input_string, record_trace=options['trace'], **budgets)
+    if result.get('error'):
+        raise ValueError(result['error'])
+
+    record = {'line': line_no, 'input': input_string, 'verdict': verdict(result)}
+    if item_id is not None:
+        record['id'] = item_id
+    if export_path is not None:
+        record['export'] = export_path
+    if options['trace']:
+        record['trace'] = list(result['trace'])
+    return record
+
+
+def read_inputs(stream, input_format):
+    for line_no, line in enumerate(stream, 1):
+        line = line.rstrip('\r\n')
+        if input_format == 'lines':
+            yield line_no, None, line
+            continue
+
+        if not line.strip():
+            continue
+        try:
+            item = json.loads(line)
+            item_id, input_string = (item.get('id'), item['input']) if isinstance(item, dict) else (None, item)
+        except ValueError as e:
+            raise ValueError(f"Invalid NDJSON on line {line_no}: {e}")
+        except KeyError:
+            raise ValueError(f"Missing 'input' on line {line_no}")
+        if not isinstance(input_string, str):
+            raise ValueError(f"Input on line {line_no} is not a string")
+        yield line_no, item_id, input_string
+
+
+def verify_stream(definition, items, options, jobs=1, chunk_size=256):
+    if jobs <= 1:
+        _init_worker(definition, options)
+        for item in items:
+            yield _verify(item)
+        return
+
+    # Only pull a bounded window of inputs at a time so huge files stream
+    from multiprocessing import Pool
+    with Pool(jobs, initializer=_init_worker, initargs=(definition, options)) as pool:
+        while True:
+            batch = list(islice(items, chunk_size * jobs))
+            if not batch:
+                break
+            yield from pool.imap(_verify, batch, chunksize=chunk_size)
+
+
+class NDJSONWriter:
+    def __init__(self, stream, trace, export=False):
+        self.stream = stream
+
+    def write(self, record):
+        self.stream.write(json.dumps(record, ensure_ascii=False) + "\n")
+
+
+class CSVWriter:
+    def __init__(self, stream, trace, export=False):
+        fields = ['line', 'id', 'input', 'verdict'] + (['trace'] if trace else []) + (['export'] if export else [])
+        self.writer = csv.DictWriter(stream, fieldnames=fields)
+        self.writer.writeheader()
+
+    def write(self, record):
+        if 'trace' in record:
+            record = dict(record, trace=json.dumps(record['trace'], ensure_ascii=False))
+        self.writer.writerow(record)
+
+
+WRITERS = {
+    'ndjson': NDJSONWriter,
+    'csv': CSVWriter,
+}
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(description="Verify input strings against a PDA definition file.")
+    parser.add_argument('definition', help="PDA definition (JSON)")
+    parser.add_argument('inputs', nargs='?', default='-', help="input file, one string per line ('-' for stdin)")
+    parser.add_argument('-o', '--output', default='-', help="output file ('-' for stdout)")
+    parser.add_argument('--input-format', choices=['lines', 'ndjson'], default='lines')
+    parser.add_argument('--format', choices=sorted(WRITERS), default='ndjson', help="output format")
+    parser.add_argument('--trace', action='store_true', help="include the execution trace")
+    parser.add_argument('--engine', choices=sorted(ENGINES), default='dfs')
+    parser.add_argument('--jobs', type=int, default=1, help="worker processes")
+    parser.add_argument('--chunk-size', type=int, default=256, help="inputs per worker task")
+    parser.add_argument('--max-depth', type=int, default=1000, help="maximum search depth")
+    parser.add_argument('--max-steps', type=int, default=None, help="maximum transitions tried per input")
+    parser.add_argument('--max-stack', type=int, default=None, help="maximum stack height")
+    parser.add_argument('--export', metavar='DIR', help="write each input's DFS trace to DIR/<line>.<format>")
+    parser.add_argument('--export-format', choices=sorted(pda_export.WRITERS), default='ndjson')
+    return parser
+
+
+def main(argv=None):
+    parser = build_parser()
+    args = parser.parse_args(argv)
+
+    if args.export:
+        if args.engine != 'dfs':
+            parser.error("--export streams the dfs engine's trace; use --engine dfs")
+        if args.trace:
+            parser.error("--trace and --export cannot be combined")
+        os.makedirs(args.export, exist_ok=True)
+
+    try:
+        pda = PDA.load(args.definition)
+    except (OSError, ValueError) as e:
+        parser.error(f"Error loading PDA: {e}")
+    if not pda.is_defined():
+        parser.error("Error loading PDA: PDA not properly defined (needs states and a start state)")
+    definition = pda.to_dict()
+
+    options = {
+        'engine': args.engine,
+        'max_depth': args.max_depth,
+        'max_steps': args.max_steps,
+        'max_stack': args.max_stack,
+        'trace': args.trace,
+        'export': args.export,
+        'export_format': args.export_format,
+    }
+
+    source = sys.stdin if args.inputs == '-' else open(args.inputs, encoding="utf-8")
+    target = sys.stdout if args.output == '-' else open(args.output, "w", encoding="utf-8", newline="")
+    try:
+        writer = WRITERS[args.format](target, args.trace, bool(args.export))
+        items = read_inputs(source, args.input_format)
+        for record in verify_stream(definition, items, options, args.jobs, args.chunk_size):
+            writer.write(record)
+    except ValueError as e:
+        parser.error(str(e))
+    finally:
+        if source is not sys.stdin:
+            source.close()
+        if target is not sys.stdout:
+            target.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
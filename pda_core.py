@@ -0,0 +1,641 @@
+"""Core pushdown automaton model shared by the GUI and the headless tools.
+
+This module must not import tkinter so that batch tools start quickly.
+"""
+
+import heapq
+import json
+from collections import defaultdict, deque
+from functools import partial
+from itertools import count
+
+EPSILON = "ε"
+ARROW = " → "
+
+
+def parse_transition(trans_str):
+    left, right = trans_str.split(ARROW)
+    state, input_char, stack_top = left.split(',')
+    next_state, stack_push = right.split(',')
+
+    key = (state.strip(), input_char.strip(), stack_top.strip())
+    value = (next_state.strip(), stack_push.strip())
+    return key, value
+
+
+def format_transition(key, value):
+    state, input_char, stack_top = key
+    next_state, stack_push = value
+    return f"{state},{input_char},{stack_top}{ARROW}{next_state},{stack_push}"
+
+
+def apply_stack(stack, stack_top, stack_push):
+    # Stacks are tuples with the top at the end
+    if stack_top != EPSILON and stack:
+        stack = stack[:-1]
+    if stack_push != EPSILON:
+        stack = stack + tuple(reversed(stack_push))
+    return stack
+
+
+def describe_delta(popped, pushed):
+    operation = []
+    if popped is not None:
+        operation.append(f"POP {popped}")
+    for char in reversed(pushed):
+        operation.append(f"PUSH {char}")
+    return "; ".join(operation) if operation else "No stack operation"
+
+
+def describe_operation(stack, stack_top, stack_push):
+    popped = stack[-1] if stack_top != EPSILON and stack else None
+    return describe_delta(popped, stack_push if stack_push != EPSILON else "")
+
+
+def format_step(state, remaining, stack, transition=None, operation=None):
+    # The stack is given top first, as the GUI shows it
+    trace_text = f"State: {state}, Input: '{remaining}', Stack: {stack}"
+    if transition:
+        trace_text += f", Transition: {transition}"
+    if operation:
+        trace_text += f", Operation: {operation}"
+    return trace_text
+
+
+class StackNode:
+    # Persistent stack cell; stacks that share a tail share its nodes
+    __slots__ = ('symbol', 'below', 'depth')
+
+    def __init__(self, symbol, below=None):
+        self.symbol = symbol
+        self.below = below
+        self.depth = below.depth + 1 if below is not None else 1
+
+
+def apply_node(node, stack_top, stack_push):
+    if stack_top != EPSILON and node is not None:
+        node = node.below
+    if stack_push != EPSILON:
+        for char in reversed(stack_push):
+            node = StackNode(char, node)
+    return node
+
+
+def stack_list(node):
+    # Materialize a persistent stack as a list, top first
+    stack = []
+    while node is not None:
+        stack.append(node.symbol)
+        node = node.below
+    return stack
+
+
+class TraceStep:
+    # One configuration of a trace. It keeps a pointer to the step it came
+    # from and the stack delta of the move; full views are built on demand.
+    __slots__ = ('index', 'parent', 'state', 'input_string', 'position', 'node', 'popped', 'pushed',
+                 'transition', 'consumed', 'note')
+
+    def __init__(self, parent, state, input_string, position, node, popped=None, pushed="",
+                 transition=None, consumed=None, note=None):
+        self.index = None
+        self.parent = parent
+        self.state = state
+        self.input_string = input_string
+        self.position = position
+        self.node = node
+        self.popped = popped
+        self.pushed = pushed
+        self.transition = transition
+        self.consumed = consumed
+        self.note = note
+
+    @property
+    def remaining_input(self):
+        return self.input_string[self.position:]
+
+    @property
+    def stack(self):
+        return stack_list(self.node)
+
+    @property
+    def operation(self):
+        if self.note is not None:
+            return self.note
+        if self.transition is None:
+            return None
+        operation = describe_delta(self.popped, self.pushed)
+        if self.consumed is not None:
+            operation += f" (consumed '{self.consumed}')"
+        return operation
+
+    @property
+    def path(self):
+        return step_path(self)
+
+    def text(self):
+        return format_step(self.state, self.remaining_input, self.stack, self.transition, self.operation)
+
+    # Mapping-style access so step records read like the GUI's dicts
+    def __getitem__(self, key):
+        try:
+            return getattr(self, key)
+        except AttributeError:
+            raise KeyError(key)
+
+    def get(self, key, default=None):
+        return getattr(self, key, default)
+
+
+def step_path(step):
+    # Transitions leading to a step record, following its parent pointers
+    path = []
+    while step is not None:
+        if step.get('transition') is not None and step.get('note') is None:
+            path.append(step['transition'])
+        step = step.get('parent')
+    path.reverse()
+    return path
+
+
+class TraceText:
+    # Read-only sequence of trace lines formatted from step records on access
+    def __init__(self, steps):
+        self.steps = steps
+
+    def __len__(self):
+        return len(self.steps)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [step.text() for step in self.steps[index]]
+        return self.steps[index].text()
+
+    def __iter__(self):
+        return (step.text() for step in self.steps)
+
+
+def _split(value):
+    if isinstance(value, str):
+        value = value.split(',')
+    return set(s.strip() for s in value if s.strip())
+
+
+class PDA:
+    def __init__(self, states=(), alphabet=(), stack_alphabet=(), transitions=None,
+                 start_state="", accept_states=(), stack_bottom="$"):
+        self.states = set(states)
+        self.alphabet = set(alphabet)
+        self.stack_alphabet = set(stack_alphabet)
+        self.start_state = start_state
+        self.accept_states = set(accept_states)
+        self.stack_bottom = stack_bottom
+
+        self.transitions = defaultdict(list)
+        for key, values in (transitions or {}).items():
+            self.transitions[key].extend(values)
+
+        # Index moves by state (and input symbol) keeping definition order
+        self._epsilon_moves = defaultdict(list)
+        self._input_moves = defaultdict(list)
+        for key, values in self.transitions.items():
+            state, input_char, stack_top = key
+            for value in values:
+                next_state, stack_push = value
+                move = (format_transition(key, value), input_char, stack_top, next_state, stack_push)
+                if input_char == EPSILON:
+                    self._epsilon_moves[state].append(move)
+                else:
+                    self._input_moves[(state, input_char)].append(move)
+
+    @classmethod
+    def from_dict(cls, data):
+        transitions = defaultdict(list)
+        for trans_str in data.get('transitions', []):
+            try:
+                key, value = parse_transition(trans_str)
+            except ValueError:
+                raise ValueError(f"Invalid transition format: {trans_str}")
+            transitions[key].append(value)
+
+        return cls(states=_split(data.get('states', ())),
+                   alphabet=_split(data.get('alphabet', ())),
+                   stack_alphabet=_split(data.get('stack_alphabet', ())),
+                   transitions=transitions,
+                   start_state=data.get('start_state', "").strip(),
+                   accept_states=_split(data.get('accept_states', ())),
+                   stack_bottom=data.get('stack_bottom', "$"))
+
+    @classmethod
+    def load(cls, path):
+        with open(path, encoding="utf-8") as f:
+            return cls.from_dict(json.load(f))
+
+    def to_dict(self):
+        return {
+            'states': sorted(self.states),
+            'alphabet': sorted(self.alphabet),
+            'stack_alphabet': sorted(self.stack_alphabet),
+            'start_state': self.start_state,
+            'accept_states': sorted(self.accept_states),
+            'stack_bottom': self.stack_bottom,
+            'transitions': [format_transition(key, value)
+                            for key, values in self.transitions.items() for value in values]
+        }
+
+    def is_defined(self):
+        return bool(self.start_state and self.states)
+
+    def successors(self, state, pos, top, input_string):
+        # Epsilon moves first, then moves reading the next input symbol
+        for move in self._epsilon_moves.get(state, ()):
+            if move[2] == EPSILON or move[2] == top:
+                yield move, pos
+        if pos < len(input_string):
+            for move in self._input_moves.get((state, input_string[pos]), ()):
+                if move[2] == EPSILON or move[2] == top:
+                    yield move, pos + 1
+
+    def run(self, input_string, step_by_step=False, max_depth=1000, max_steps=None,
+            max_stack=None, record_trace=True, on_step=None):
+        # on_step is called with every step record as the search creates it,
+        # so exporters can stream traces that are never held in memory
+        if not self.is_defined():
+            return {'accepted': False, 'error': 'PDA not properly defined'}
+
+        steps = []
+        indices = count()
+
+        def add_step(step):
+            step.index = next(indices)
+            if record_trace:
+                steps.append(step)
+            if on_step is not None:
+                on_step(step)
+            return step
+
+        node = StackNode(self.stack_bottom)
+        end = len(input_string)
+        root = add_step(TraceStep(None, self.start_state, input_string, 0, node))
+
+        final_step = root
+        accepted = False
+        exhausted = False
+        taken = 0
+
+        # Depth-first search with an explicit frame stack instead of recursion
+        if end == 0 and self.start_state in self.accept_states:
+            final_step = add_step(TraceStep(root, self.start_state, input_string, end, node,
+                                            transition="ACCEPT", note="Accepting state reached"))
+            accepted = True
+        frames = [] if accepted else [(self.successors(self.start_state, 0, node.symbol, input_string), root, 0)]
+
+        while frames:
+            moves, parent, depth = frames[-1]
+            found = next(moves, None)
+            if found is None:
+                frames.pop()
+                continue
+            if max_steps is not None and taken >= max_steps:
+                exhausted = True
+                break
+            taken += 1
+
+            (transition_str, input_char, stack_top, next_state, stack_push), next_pos = found
+            new_node = apply_node(parent.node, stack_top, stack_push)
+            if max_stack is not None and new_node is not None and new_node.depth > max_stack:
+                exhausted = True
+                continue
+
+            popped = parent.node.symbol if stack_top != EPSILON and parent.node is not None else None
+            step = final_step = add_step(TraceStep(parent, next_state, input_string, next_pos, new_node, popped,
+                                                   stack_push if stack_push != EPSILON else "", transition_str,
+                                                   input_char if input_char != EPSILON else None))
+
+            if max_depth is not None and depth + 1 > max_depth:
+                exhausted = True
+                continue
+            if next_pos == end and next_state in self.accept_states:
+                final_step = add_step(TraceStep(step, next_state, input_string, end, new_node,
+                                                transition="ACCEPT", note="Accepting state reached"))
+                accepted = True
+                break
+            top = new_node.symbol if new_node is not None else None
+            frames.append((self.successors(next_state, next_pos, top, input_string), step, depth + 1))
+
+        return {
+            'accepted': accepted,
+            'exhausted': exhausted and not accepted,
+            'final_state': self.start_state,
+            'final_stack': [self.stack_bottom],
+            'trace': TraceText(steps),
+            'steps': steps if step_by_step else [],
+            'final_step': final_step
+        }
+
+    def run_bfs(self, input_string, max_depth=None, max_steps=None, max_stack=None,
+                record_trace=True):
+        if not self.is_defined():
+            return {'accepted': False, 'error': 'PDA not properly defined'}
+
+        trace = []
+        end = len(input_string)
+        start = (self.start_state, 0, (self.stack_bottom,))
+        visited = {start}
+        queue = deque([(start, 0)])
+
+        accepted = False
+        exhausted = False
+        taken = 0
+
+        # Breadth-first search over configurations, each visited once
+        while queue:
+            (state, pos, stack), depth = queue.popleft()
+            if record_trace:
+                trace.append(format_step(state, input_string[pos:], list(reversed(stack))))
+            if pos == end and state in self.accept_states:
+                accepted = True
+                break
+            top = stack[-1] if stack else None
+            if max_depth is not None and depth >= max_depth:
+                # Only a configuration that could still move is cut short
+                if next(self.successors(state, pos, top, input_string), None) is not None:
+                    exhausted = True
+                continue
+
+            for (_, _, stack_top, next_state, stack_push), next_pos in self.successors(state, pos, top, input_string):
+                if max_steps is not None and taken >= max_steps:
+                    exhausted = True
+                    queue.clear()
+                    break
+                taken += 1
+
+                new_stack = apply_stack(stack, stack_top, stack_push)
+                if max_stack is not None and len(new_stack) > max_stack:
+                    exhausted = True
+                    continue
+                config = (next_state, next_pos, new_stack)
+                if config not in visited:
+                    visited.add(config)
+                    queue.append((config, depth + 1))
+
+        return {
+            'accepted': accepted,
+            'exhausted': exhausted and not accepted,
+            'final_state': self.start_state,
+            'final_stack': [self.stack_bottom],
+            'trace': trace,
+            'steps': []
+        }
+
+    def witness(self, input_string, cost='moves', max_depth=None, max_steps=None, max_stack=None,
+                record_trace=True):
+        # Best-first search for the cheapest accepting computation. The cost is
+        # either the number of moves or the highest stack reached (then moves).
+        # On rejection the witness leads to the longest consumed prefix instead.
+        if not self.is_defined():
+            return {'accepted': False, 'error': 'PDA not properly defined'}
+        if cost not in ('moves', 'stack'):
+            raise ValueError(f"Unknown witness cost: {cost}")
+
+        end = len(input_string)
+        start = (self.start_state, 0, (self.stack_bottom,))
+        start_key = (1, 0) if cost == 'stack' else (0,)
+
+        # best[config] = (key, parent config, move used to reach it)
+        best = {start: (start_key, None, None)}
+        order = count()
+        heap = [(start_key, next(order), start)]
+        settled = set()
+
+        deepest = start
+        goal = None
+        exhausted = False
+        taken = 0
+
+        while heap:
+            key, _, config = heapq.heappop(heap)
+            if config in settled:
+                continue
+            settled.add(config)
+
+            state, pos, stack = config
+            if pos > deepest[1]:
+                deepest = config
+            if pos == end and state in self.accept_states:
+                goal = config
+                break
+            moves = key[-1]
+            top = stack[-1] if stack else None
+            if max_depth is not None and moves >= max_depth:
+                if next(self.successors(state, pos, top, input_string), None) is not None:
+                    exhausted = True
+                continue
+
+            for move, next_pos in self.successors(state, pos, top, input_string):
+                if max_steps is not None and taken >= max_steps:
+                    exhausted = True
+                    heap.clear()
+                    break
+                taken += 1
+
+                new_stack = apply_stack(stack, move[2], move[4])
+                if max_stack is not None and len(new_stack) > max_stack:
+                    exhausted = True
+                    continue
+                next_config = (move[3], next_pos, new_stack)
+                if next_config in settled:
+                    continue
+
+                if cost == 'stack':
+                    next_key = (max(key[0], len(new_stack)), moves + 1)
+                else:
+                    next_key = (moves + 1,)
+                if next_config not in best or next_key < best[next_config][0]:
+                    best[next_config] = (next_key, config, move)
+                    heapq.heappush(heap, (next_key, next(order), next_config))
+
+        target = goal or deepest
+        path = []
+        config = target
+        while config is not None:
+            _, parent, move = best[config]
+            path.append((config, move))
+            config = parent
+        path.reverse()
+
+        trace = []
+        if record_trace:
+            previous = None
+            for (state, pos, stack), move in path:
+                if move is None:
+                    trace.append(format_step(state, input_string[pos:], list(reversed(stack))))
+                else:
+                    operation_str = describe_operation(previous, move[2], move[4])
+                    if move[1] != EPSILON:
+                        operation_str += f" (consumed '{move[1]}')"
+                    trace.append(format_step(state, input_string[pos:], list(reversed(stack)), move[0], operation_str))
+                previous = stack
+
+        return {
+            'accepted': goal is not None,
+            'exhausted': exhausted and goal is None,
+            'final_state': target[0],
+            'final_stack': list(reversed(target[2])),
+            'witness': [move[0] for _, move in path[1:]],
+            'moves': len(path) - 1,
+            'max_stack': max(len(stack) for (_, _, stack), _ in path),
+            'longest_prefix': input_string[:target[1]],
+            'explored': len(settled),
+            'trace': trace,
+            'steps': []
+        }
+
+    def stack_symbols(self):
+        symbols = set(self.stack_alphabet) | {self.stack_bottom}
+        for (_, _, stack_top), values in self.transitions.items():
+            if stack_top != EPSILON:
+                symbols.add(stack_top)
+            for _, stack_push in values:
+                if stack_push != EPSILON:
+                    symbols.update(stack_push)
+        return symbols
+
+    def input_symbols(self):
+        symbols = set(a for a in self.alphabet if len(a) == 1)
+        symbols.update(input_char for (_, input_char, _) in self.transitions
+                       if input_char != EPSILON and len(input_char) == 1)
+        return sorted(symbols)
+
+    def is_empty(self):
+        # Saturate a P-automaton for pre*(accepting configurations) and check
+        # whether it contains the initial configuration. Stack words are read
+        # top first and end with a sentinel (None) standing for the empty stack.
+        if not self.is_defined():
+            return True
+
+        symbols = self.stack_symbols() | {None}
+        rules = []
+        for (state, input_char, stack_top), values in self.transitions.items():
+            # Multi-character input labels never fire, as in input_symbols
+            if input_char != EPSILON and len(input_char) != 1:
+                continue
+            for next_state, stack_push in values:
+                pushed = tuple(stack_push) if stack_push != EPSILON else ()
+                if stack_top != EPSILON:
+                    rules.append((state, stack_top, next_state, pushed))
+                else:
+                    # Moves that ignore the top keep whatever symbol is there
+                    for symbol in symbols:
+                        rules.append((state, symbol, next_state, pushed + (symbol,)))
+
+        sink = object()
+        edges = defaultdict(set)
+        for symbol in symbols:
+            edges[(sink, symbol)].add(sink)
+            for state in self.accept_states:
+                edges[(state, symbol)].add(sink)
+
+        def reach(state, word):
+            current = {state}
+            for symbol in word:
+                current = set().union(*(edges.get((q, symbol), ()) for q in current))
+                if not current:
+                    break
+            return current
+
+        changed = True
+        while changed:
+            changed = False
+            for state, symbol, next_state, word in rules:
+                targets = reach(next_state, word) - edges[(state, symbol)]
+                if targets:
+                    edges[(state, symbol)] |= targets
+                    changed = True
+
+        return sink not in reach(self.start_state, (self.stack_bottom, None))
+
+    def accepted_strings(self, max_length, max_stack=100, max_configs=100000):
+        # Yield accepted strings by length, then alphabetically. Words that
+        # reach the same set of configurations share one memoized step, and
+        # configurations whose stack grows past max_stack are dropped.
+        # ε-moves that push can still make a closure exponential in
+        # max_stack, so once max_configs configurations have been explored
+        # the enumeration stops with RuntimeError; everything yielded before
+        # that is complete for its length (None lifts the limit).
+        if not self.is_defined():
+            return
+
+        symbols = self.input_symbols()
+        closures = {}
+        steps = {}
+        explored = 0
+
+        def close(configs):
+            nonlocal explored
+            configs = frozenset(configs)
+            if configs in closures:
+                return closures[configs]
+            seen = set(configs)
+            queue = deque(configs)
+            while queue:
+                state, stack = queue.popleft()
+                for move, _ in self.successors(state, 0, stack[-1] if stack else None, ""):
+                    new_stack = apply_stack(stack, move[2], move[4])
+                    config = (move[3], new_stack)
+                    if len(new_stack) <= max_stack and config not in seen:
+                        explored += 1
+                        if max_configs is not None and explored > max_configs:
+                            raise RuntimeError(f"Enumeration stopped after exploring {max_configs} "
+                                               f"configurations; results are incomplete")
+                        seen.add(config)
+                        queue.append(config)
+            closures[configs] = result = frozenset(seen)
+            return result
+
+        def step(configs, symbol):
+            key = (configs, symbol)
+            if key not in steps:
+                moved = set()
+                for state, stack in configs:
+                    for move, next_pos in self.successors(state, 0, stack[-1] if stack else None, symbol):
+                        if next_pos == 1:
+                            new_stack = apply_stack(stack, move[2], move[4])
+                            if len(new_stack) <= max_stack:
+                                moved.add((move[3], new_stack))
+                steps[key] = close(moved) if moved else frozenset()
+            return steps[key]
+
+        layer = {close({(self.start_state, (self.stack_bottom,))}): [""]}
+        for length in range(max_length + 1):
+            accepted = []
+            for configs, words in layer.items():
+                if any(state in self.accept_states for state, _ in configs):
+                    accepted.extend(words)
+            yield from sorted(accepted)
+
+            if length == max_length:
+                break
+            next_layer = defaultdict(list)
+            for configs, words in layer.items():
+                for symbol in symbols:
+                    moved = step(configs, symbol)
+                    if moved:
+                        next_layer[moved].extend(word + symbol for word in words)
+            layer = next_layer
+
+
+def verdict(result):
+    if result['accepted']:
+        return 'ACCEPTED'
+    if result.get('exhausted'):
+        return 'UNKNOWN'
+    return 'REJECTED'
+
+
+ENGINES = {
+    'dfs': PDA.run,
+    'bfs': PDA.run_bfs,
+    'shortest': partial(PDA.witness, cost='moves'),
+    'min-stack': partial(PDA.witness, cost='stack'),
+}
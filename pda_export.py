@@ -0,0 +1,279 @@
+"""Streaming exporters for PDA traces and explored configuration graphs.
+
+Writers receive step records while the search runs and write them straight
+to disk, so long traces are never held in memory. Stacks are delta encoded:
+each step stores its parent step plus the symbol it popped and the string it
+pushed (first character on top). The root step pushes the initial stack.
+
+Example:
+    with open("trace.ndjson", "w", encoding="utf-8") as f:
+        export_run(pda, "(())", [NDJSONTraceWriter(f)])
+    steps = TraceReader("trace.ndjson")
+"""
+
+import csv
+import json
+import mmap
+from array import array
+from collections import OrderedDict
+
+from pda_core import StackNode, describe_delta, stack_list, verdict
+
+TRACE_FORMAT = "pda-trace"
+TRACE_VERSION = 1
+
+
+def step_record(step):
+    parent = step.parent
+    if parent is None:
+        # The root has no parent, so it "pushes" its whole stack
+        popped, pushed = None, "".join(stack_list(step.node))
+    else:
+        popped, pushed = step.popped, step.pushed
+    return {
+        'step': step.index,
+        'parent': parent.index if parent is not None else None,
+        'state': step.state,
+        'position': step.position,
+        'pop': popped,
+        'push': pushed,
+        'consumed': step.consumed,
+        'transition': step.transition,
+        'note': step.note,
+    }
+
+
+def winning_path(step):
+    path = []
+    while step is not None:
+        path.append(step.index)
+        step = step.parent
+    path.reverse()
+    return path
+
+
+class NDJSONTraceWriter:
+    # One header line, one line per step, one footer line with the verdict
+    def __init__(self, stream):
+        self.stream = stream
+
+    def begin(self, pda, input_string):
+        header = {'format': TRACE_FORMAT, 'version': TRACE_VERSION, 'input': input_string,
+                  'start_state': pda.start_state, 'stack_bottom': pda.stack_bottom}
+        self.stream.write(json.dumps(header, ensure_ascii=False) + "\n")
+
+    def step(self, step):
+        self.stream.write(json.dumps(step_record(step), ensure_ascii=False) + "\n")
+
+    def finish(self, result):
+        footer = {
+            'final_result': verdict(result),
+            'exhausted': result.get('exhausted', False),
+            'winning_path': winning_path(result['final_step']) if result['accepted'] else [],
+        }
+        self.stream.write(json.dumps(footer, ensure_ascii=False) + "\n")
+
+
+class DOTGraphWriter:
+    # Graphviz digraph of every explored configuration; the winning path is
+    # highlighted at the end by restating its nodes with extra attributes
+    def __init__(self, stream):
+        self.stream = stream
+
+    @staticmethod
+    def quote(text):
+        return json.dumps(text, ensure_ascii=False)
+
+    def begin(self, pda, input_string):
+        self.stream.write(f"digraph trace {{\n  label={self.quote('Input: ' + input_string)};\n"
+                          f"  node [shape=box, fontname=\"Courier\"];\n")
+
+    def step(self, step):
+        top = step.node.symbol if step.node is not None else "ε"
+        label = f"{step.state}\n'{step.remaining_input}'\ntop: {top}"
+        self.stream.write(f"  s{step.index} [label={self.quote(label)}];\n")
+        if step.parent is not None:
+            self.stream.write(f"  s{step.parent.index} -> s{step.index} "
+                              f"[label={self.quote(step.transition or '')}];\n")
+
+    def finish(self, result):
+        if result['accepted']:
+            for index in winning_path(result['final_step']):
+                self.stream.write(f"  s{index} [color=red, penwidth=2];\n")
+        self.stream.write("}\n")
+
+
+class ColumnarCSVWriter:
+    # Compact CSV for large runs: parent is stored as a backwards offset
+    # and stacks only as the pop/push delta of each move. Like the NDJSON
+    # form it is framed by a header (names row, values row) carrying the
+    # input and stack bottom, and a footer of the same shape with the
+    # verdict; the footer's names row starts with 'final_result'.
+    HEADER = ['format', 'version', 'input', 'start_state', 'stack_bottom']
+    FIELDS = ['step', 'parent_offset', 'state', 'position', 'pop', 'push', 'consumed', 'transition', 'note']
+    FOOTER = ['final_result', 'exhausted', 'winning_path']
+
+    def __init__(self, stream):
+        self.writer = csv.writer(stream)
+
+    def begin(self, pda, input_string):
+        self.writer.writerow(self.HEADER)
+        self.writer.writerow([TRACE_FORMAT, TRACE_VERSION, input_string, pda.start_state, pda.stack_bottom])
+        self.writer.writerow(self.FIELDS)
+
+    def step(self, step):
+        record = step_record(step)
+        parent = record['parent']
+        self.writer.writerow([record['step'], record['step'] - parent if parent is not None else "",
+                              record['state'], record['position'], record['pop'] or "",
+                              record['push'], record['consumed'] or "", record['transition'] or "",
+                              record['note'] or ""])
+
+    def finish(self, result):
+        path = winning_path(result['final_step']) if result['accepted'] else []
+        self.writer.writerow(self.FOOTER)
+        self.writer.writerow([verdict(result), str(result.get('exhausted', False)).lower(),
+                              " ".join(map(str, path))])
+
+
+WRITERS = {
+    'ndjson': NDJSONTraceWriter,
+    'dot': DOTGraphWriter,
+    'csv': ColumnarCSVWriter,
+}
+
+
+def export_run(pda, input_string, writers, **budgets):
+    for writer in writers:
+        writer.begin(pda, input_string)
+
+    def on_step(step):
+        for writer in writers:
+            writer.step(step)
+
+    result = pda.run(input_string, record_trace=False, on_step=on_step, **budgets)
+    if result.get('error'):
+        raise ValueError(result['error'])
+    for writer in writers:
+        writer.finish(result)
+    return result
+
+
+class TraceReader:
+    # Random access to an NDJSON trace without loading it: the file is
+    # memory-mapped and only an array of line offsets is kept in RAM.
+    # Stacks are rebuilt from the deltas along the parent chain, with a
+    # bounded cache of persistent stack nodes for recently visited steps.
+    def __init__(self, path, cache_size=4096):
+        self.file = open(path, "rb")
+        try:
+            self.map = mmap.mmap(self.file.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            self.file.close()
+            raise ValueError(f"Empty trace file: {path}")
+
+        self.offsets = array('q')
+        self.size = len(self.map)
+        pos = 0
+        while pos < self.size:
+            self.offsets.append(pos)
+            end = self.map.find(b"\n", pos)
+            if end == -1:
+                break
+            pos = end + 1
+
+        try:
+            header = self._line(0)
+        except ValueError:
+            header = None
+        if not isinstance(header, dict) or header.get('format') != TRACE_FORMAT:
+            self.close()
+            raise ValueError(f"Not a PDA trace file: {path}")
+        self.input_string = header['input']
+        self.stack_bottom = header.get('stack_bottom', "$")
+
+        # A trace cut short while exporting has no footer and may end mid-line
+        footer = {}
+        if len(self.offsets) > 1:
+            try:
+                footer = self._line(len(self.offsets) - 1)
+            except ValueError:
+                self.size = self.offsets.pop()
+        if 'final_result' in footer:
+            self.final_result = footer['final_result']
+            self.winning_path = footer.get('winning_path', [])
+            self.count = len(self.offsets) - 2
+        else:
+            self.final_result = None
+            self.winning_path = []
+            self.count = len(self.offsets) - 1
+
+        self.cache_size = cache_size
+        self.nodes = OrderedDict()
+
+    def _line(self, line_no):
+        start = self.offsets[line_no]
+        end = self.offsets[line_no + 1] if line_no + 1 < len(self.offsets) else self.size
+        return json.loads(self.map[start:end].decode("utf-8"))
+
+    def record(self, index):
+        if not 0 <= index < self.count:
+            raise IndexError(index)
+        return self._line(index + 1)
+
+    def _node(self, index, record):
+        # Walk up to the nearest cached ancestor, then replay the deltas down
+        chain = []
+        node = None
+        while True:
+            if index in self.nodes:
+                node = self.nodes[index]
+                self.nodes.move_to_end(index)
+                break
+            chain.append(record)
+            if record['parent'] is None:
+                break
+            index = record['parent']
+            record = self.record(index)
+
+        for record in reversed(chain):
+            if record['parent'] is None:
+                # The root's stack is the bottom symbol, which may be longer than one character
+                node = StackNode(self.stack_bottom)
+            else:
+                if record['pop'] is not None and node is not None:
+                    node = node.below
+                for char in reversed(record['push']):
+                    node = StackNode(char, node)
+            self.nodes[record['step']] = node
+            if len(self.nodes) > self.cache_size:
+                self.nodes.popitem(last=False)
+        return node
+
+    def __len__(self):
+        return self.count
+
+    def __getitem__(self, index):
+        record = self.record(index)
+        if record['note'] is not None:
+            operation = record['note']
+        elif record['transition'] is not None:
+            operation = describe_delta(record['pop'], record['push'])
+            if record['consumed'] is not None:
+                operation += f" (consumed '{record['consumed']}')"
+        else:
+            operation = None
+
+        return {
+            'state': record['state'],
+            'position': record['position'],
+            'remaining_input': self.input_string[record['position']:],
+            'stack': stack_list(self._node(index, record)),
+            'transition': record['transition'],
+            'operation': operation,
+            'consumed': record['consumed'],
+        }
+
+    def close(self):
+        self.map.close()
+        self.file.close()
@@ -0,0 +1,357 @@
+"""Local asyncio server answering acceptance queries against preloaded PDAs.
+
+Every *.json definition in a directory is served under its file name, e.g.
+examples/balanced_parentheses.json becomes "balanced_parentheses". Searches
+run in a process pool so the event loop never blocks, and changed files are
+picked up without a restart.
+
+Example:
+    python pda_server.py examples --port 8765
+    curl -d '{"pda": "balanced_parentheses", "input": "(())"}' localhost:8765/accept
+"""
+
+import argparse
+import asyncio
+import ipaddress
+import json
+import os
+import signal
+import sys
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+from pda_core import ENGINES, PDA, verdict
+
+_compiled = {}
+BUDGETS = ('max_depth', 'max_steps', 'max_stack')
+
+
+def _expire(signum, frame):
+    raise TimeoutError("Query time limit reached")
+
+
+def _query(name, version, definition, input_string, options):
+    # Runs in a worker process; each worker compiles a definition once per version
+    cached = _compiled.get(name)
+    if cached is None or cached[0] != version:
+        cached = _compiled[name] = (version, PDA.from_dict(definition))
+    pda = cached[1]
+
+    # The worker interrupts its own search so a runaway query frees its process
+    timeout = options.get('timeout')
+    alarm = bool(timeout) and hasattr(signal, 'setitimer')
+    if alarm:
+        signal.signal(signal.SIGALRM, _expire)
+        signal.setitimer(signal.ITIMER_REAL, timeout)
+    try:
+        run = ENGINES[options['engine']]
+        result = run(pda, input_string, max_depth=options['max_depth'], max_steps=options['max_steps'],
+                     max_stack=options['max_stack'], record_trace=options['trace'])
+    finally:
+        if alarm:
+            signal.setitimer(signal.ITIMER_REAL, 0)
+    if result.get('error'):
+        raise ValueError(result['error'])
+
+    response = {'pda': name, 'input': input_string, 'verdict': verdict(result)}
+    if options['trace']:
+        response['trace'] = list(result['trace'])
+    return response
+
+
+class Registry:
+    def __init__(self, directory):
+        self.directory = directory
+        self.pdas = {}
+
+    def reload(self):
+        # Runs off the event loop, so the new table is built aside and
+        # swapped in with one assignment. Returns the names that were
+        # added, changed or removed.
+        current = self.pdas
+        pdas = {}
+        changed = []
+        for entry in os.scandir(self.directory):
+            if not entry.name.endswith('.json') or not entry.is_file():
+                continue
+            name = entry.name[:-len('.json')]
+            version = entry.stat().st_mtime_ns
+            if name in current and current[name][0] == version:
+                pdas[name] = current[name]
+                continue
+            try:
+                definition = PDA.load(entry.path).to_dict()
+            except (OSError, ValueError) as e:
+                print(f"Error loading {entry.path}: {e}", file=sys.stderr)
+                if name in current:
+                    pdas[name] = current[name]
+                continue
+            pdas[name] = (version, definition)
+            changed.append(name)
+
+        changed.extend(set(current) - set(pdas))
+        self.pdas = pdas
+        return changed
+
+
+class Metrics:
+    def __init__(self, window=1024):
+        self.started = time.monotonic()
+        self.requests = 0
+        self.errors = 0
+        self.in_flight = 0
+        self.latencies = deque(maxlen=window)
+        self.completed = deque()
+
+    def record(self, latency, error=False):
+        now = time.monotonic()
+        self.requests += 1
+        self.errors += error
+        self.latencies.append(latency)
+        self.completed.append(now)
+        while self.completed and self.completed[0] < now - 60:
+            self.completed.popleft()
+
+    def snapshot(self):
+        uptime = time.monotonic() - self.started
+        latencies = sorted(self.latencies)
+
+        def percentile(p):
+            if not latencies:
+                return 0.0
+            return latencies[min(len(latencies) - 1, int(p * len(latencies)))] * 1000
+
+        return {
+            'uptime': uptime,
+            'requests': self.requests,
+            'errors': self.errors,
+            'in_flight': self.in_flight,
+            'throughput': {
+                'overall': self.requests / uptime if uptime else 0.0,
+                'last_minute': len(self.completed) / min(60.0, uptime) if uptime else 0.0,
+            },
+            'latency_ms': {
+                'mean': sum(latencies) / len(latencies) * 1000 if latencies else 0.0,
+                'p50': percentile(0.50),
+                'p95': percentile(0.95),
+                'p99': percentile(0.99),
+                'max': latencies[-1] * 1000 if latencies else 0.0,
+            },
+        }
+
+
+class HTTPError(Exception):
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+
+
+REASONS = {200: "OK", 400: "Bad Request", 404: "Not Found", 405: "Method Not Allowed",
+           500: "Internal Server Error", 504: "Gateway Timeout"}
+
+
+def _budget(request, key, limit):
+    # Requests may tighten the server's budgets but never lift or raise them
+    value = request.get(key, limit)
+    if value is not None and (isinstance(value, bool) or not isinstance(value, int) or value < 0):
+        raise HTTPError(400, f"'{key}' must be a non-negative integer or null")
+    if limit is not None and (value is None or value > limit):
+        return limit
+    return value
+
+
+class PDAServer:
+    def __init__(self, registry, executor, reload_interval=1.0, default_options=None):
+        self.registry = registry
+        self.executor = executor
+        self.reload_interval = reload_interval
+        self.default_options = default_options or {}
+        self.metrics = Metrics()
+        self.routes = {
+            ('GET', '/pdas'): self.list_pdas,
+            ('GET', '/metrics'): self.get_metrics,
+            ('POST', '/accept'): self.accept,
+            ('POST', '/trace'): self.trace,
+        }
+
+    async def watch(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            await asyncio.sleep(self.reload_interval)
+            changed = await loop.run_in_executor(None, self.registry.reload)
+            if changed:
+                print(f"Reloaded: {', '.join(sorted(changed))}", file=sys.stderr)
+
+    async def handle_connection(self, reader, writer):
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line.strip():
+                    break
+                method, path, _ = request_line.decode('latin-1').split(' ', 2)
+
+                headers = {}
+                while True:
+                    line = await reader.readline()
+                    if line in (b'\r\n', b'\n', b''):
+                        break
+                    key, _, value = line.decode('latin-1').partition(':')
+                    headers[key.strip().lower()] = value.strip()
+                length = int(headers.get('content-length', 0))
+                body = await reader.readexactly(length) if length else b''
+
+                status, payload = await self.dispatch(method, path.split('?', 1)[0], body)
+                data = json.dumps(payload, ensure_ascii=False).encode('utf-8')
+                keep_alive = headers.get('connection', '').lower() != 'close'
+                writer.write(
+                    f"HTTP/1.1 {status} {REASONS.get(status, '')}\r\n"
+                    f"Content-Type: application/json\r\n"
+                    f"Content-Length: {len(data)}\r\n"
+                    f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n".encode('latin-1') + data)
+                await writer.drain()
+                if not keep_alive:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError, ValueError):
+            pass
+        finally:
+            writer.close()
+
+    async def dispatch(self, method, path, body):
+        handler = self.routes.get((method, path))
+        if handler is None:
+            if any(route_path == path for _, route_path in self.routes):
+                return 405, {'error': f"Method {method} not allowed for {path}"}
+            return 404, {'error': f"Unknown path: {path}"}
+
+        started = time.perf_counter()
+        self.metrics.in_flight += 1
+        error = False
+        try:
+            return 200, await handler(body)
+        except HTTPError as e:
+            error = True
+            return e.status, {'error': str(e)}
+        except Exception as e:
+            error = True
+            return 500, {'error': str(e)}
+        finally:
+            self.metrics.in_flight -= 1
+            self.metrics.record(time.perf_counter() - started, error)
+
+    async def list_pdas(self, body):
+        return {'pdas': {name: {'version': version} for name, (version, _) in sorted(self.registry.pdas.items())}}
+
+    async def get_metrics(self, body):
+        return self.metrics.snapshot()
+
+    async def accept(self, body):
+        return await self.query(body, trace=False)
+
+    async def trace(self, body):
+        return await self.query(body, trace=True)
+
+    async def query(self, body, trace):
+        try:
+            request = json.loads(body or b'{}')
+        except ValueError:
+            raise HTTPError(400, "Request body must be JSON")
+        if not isinstance(request, dict) or not isinstance(request.get('input'), str):
+            raise HTTPError(400, "Request must be an object with a string 'input'")
+
+        name = request.get('pda')
+        entry = self.registry.pdas.get(name) if isinstance(name, str) else None
+        if entry is None:
+            raise HTTPError(404, f"Unknown PDA: {name}")
+        version, definition = entry
+
+        options = dict(self.default_options, trace=trace)
+        engine = request.get('engine', options['engine'])
+        if not isinstance(engine, str) or engine not in ENGINES:
+            raise HTTPError(400, f"Unknown engine: {engine!r}")
+        options['engine'] = engine
+        for key in BUDGETS:
+            options[key] = _budget(request, key, self.default_options.get(key))
+
+        loop = asyncio.get_running_loop()
+        timeout = options.get('timeout')
+        try:
+            # The outer limit only backs up the worker's own alarm
+            return await asyncio.wait_for(
+                loop.run_in_executor(self.executor, _query, name, version, definition,
+                                     request['input'], options),
+                timeout + 1 if timeout else None)
+        except ValueError as e:
+            raise HTTPError(400, str(e))
+        except (TimeoutError, asyncio.TimeoutError):
+            raise HTTPError(504, f"Query exceeded the {timeout}s time limit")
+
+
+async def serve(args):
+    registry = Registry(args.directory)
+    registry.reload()
+    print(f"Loaded: {', '.join(sorted(registry.pdas)) or '(none)'}", file=sys.stderr)
+
+    default_options = {
+        'engine': args.engine,
+        'max_depth': args.max_depth,
+        'max_steps': args.max_steps,
+        'max_stack': args.max_stack,
+        'timeout': args.timeout,
+    }
+
+    with ProcessPoolExecutor(max_workers=args.jobs) as executor:
+        app = PDAServer(registry, executor, args.reload_interval, default_options)
+        if args.unix:
+            server = await asyncio.start_unix_server(app.handle_connection, path=args.unix)
+            print(f"Listening on {args.unix}", file=sys.stderr)
+        else:
+            server = await asyncio.start_server(app.handle_connection, args.host, args.port)
+            print(f"Listening on http://{args.host}:{args.port}", file=sys.stderr)
+
+        watcher = asyncio.create_task(app.watch())
+        try:
+            async with server:
+                await server.serve_forever()
+        finally:
+            watcher.cancel()
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(description="Serve PDA acceptance queries on localhost.")
+    parser.add_argument('directory', help="directory of PDA definitions (*.json)")
+    parser.add_argument('--host', default='127.0.0.1', help="loopback address to bind")
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--unix', help="listen on a Unix socket instead of TCP")
+    parser.add_argument('--jobs', type=int, default=None, help="worker processes")
+    parser.add_argument('--reload-interval', type=float, default=1.0, help="seconds between definition scans")
+    parser.add_argument('--engine', choices=sorted(ENGINES), default='dfs')
+    parser.add_argument('--max-depth', type=int, default=1000, help="maximum search depth")
+    parser.add_argument('--max-steps', type=int, default=None, help="maximum transitions tried per query")
+    parser.add_argument('--max-stack', type=int, default=None, help="maximum stack height")
+    parser.add_argument('--timeout', type=float, default=10.0, help="seconds before a query is abandoned (0 for none)")
+    return parser
+
+
+def main(argv=None):
+    parser = build_parser()
+    args = parser.parse_args(argv)
+
+    try:
+        loopback = args.host == 'localhost' or ipaddress.ip_address(args.host).is_loopback
+    except ValueError:
+        loopback = False
+    if not loopback:
+        parser.error(f"Refusing to bind non-loopback address: {args.host}")
+    if not os.path.isdir(args.directory):
+        parser.error(f"Not a directory: {args.directory}")
+
+    try:
+        asyncio.run(serve(args))
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())